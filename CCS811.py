@@ -2,7 +2,7 @@
 ##
 # @file       CCS811.py
 #
-# @version    1.3.0
+# @version    1.5.0
 #
 # @mainpage   Raspberry Pi CCS811 Python Driver
 #
@@ -43,23 +43,53 @@
 #   Sat Dec 18 2021 | Ekkehard Blanz | made a lot more robust to run on
 #                   |                | Raspberry Pi
 #   Wed Dec 22 2021 | Ekkehard Blanz | turned into properties what should be
+#   Fri Aug 28 2026 | Ekkehard Blanz | moved interrupt-mode I2C work out of the
+#                   |                | ISR into a worker thread and exposed its
+#                   |                | data-ready event as a property; added
+#                   |                | setMeasInterval()
 #                   |                |
 
 
 import time
 import sys
+from collections import deque
 try:
-    # Raspberry Pi Pico has no os module - all modules need to be installed
-    # in the system path or else the path needs to be appended manually
+    from GPIO_AL import GPIOError, IOpin
+except ImportError:
+    # on a Raspberry Pi running an OS, GPIO_AL may live in a sibling
+    # directory of this package so the path needs to be appended manually -
+    # the Raspberry Pi Pico has no os module, but there all modules need to
+    # be installed in the system path anyway
     import os.path
     import os
     sys.path.append( os.path.join( os.path.dirname( __file__ ),
                                    os.pardir,
                                    'GPIO_AL' ) )
+    from GPIO_AL import GPIOError, IOpin
+
+try:
+    import threading
 except ImportError:
-    pass
+    # MicroPython has no threading module - there, GPIO interrupts are soft
+    # IRQs dispatched by the interpreter and may perform I2C work directly
+    threading = None
+
+try:
+    _timestamp = time.monotonic_ns
+except AttributeError:
+    # MicroPython does not provide monotonic_ns
+    _timestamp = time.time
+
 
-from GPIO_AL import GPIOError, IOpin
+class _NullLock( object ):
+    """!
+    @brief Lock stand-in for single-threaded (MicroPython) operation.
+    """
+    def __enter__( self ):
+        return self
+
+    def __exit__( self, type, value, traceback ):
+        return False
 
 
 class CCS811( object ):
@@ -124,6 +154,12 @@ class CCS811( object ):
     MEAS_INT_60 = 3
     MEAS_INT_250MS = 4
     DEFAULT_MEAS_INT = MEAS_INT_1
+    # duration of each measurement interval in seconds
+    MEAS_INTERVAL_SECONDS = {MEAS_INT_IDLE: 0.,
+                             MEAS_INT_1: 1.,
+                             MEAS_INT_10: 10.,
+                             MEAS_INT_60: 60.,
+                             MEAS_INT_250MS: 0.25}
     # ADDR is set by wiring ADDR Pin 1 to HIGH or LOW (s. data sheet p. 4)
     ADDR_LOW = 0x5A
     ADDR_HIGH = 0x5B
@@ -131,6 +167,8 @@ class CCS811( object ):
     DEFAULT_ADDR = ADDR_HIGH
     # number of attempts in dataReady() before we give up
     ATTEMPTS = 5
+    # number of most recent measurements kept in the history buffer
+    HISTORY_DEPTH = 64
 
     # static private constants:
     # -------------------------
@@ -166,6 +204,15 @@ class CCS811( object ):
     __DRIVE_MODE_BIT = 4  # actually bits 4, 5, and 6 - this is the shift amount
     __INT_DATARDY_BIT = 3
     __INT_THRESH_BIT = 2
+    # error messages indexed by error code bit (s. data sheet p. 24)
+    __ERR_MSGS = ('Write request to wrong register received',
+                  'Read request for wrong register received',
+                  'Invalid MeasMode received',
+                  'Sensor resistance reached max resistance',
+                  'Heater Current is not in range',
+                  'Heater supply voltage is not applied correctly',
+                  'Could not read error registers',
+                  'Unspecified error')
 
 
     def __init__( self,
@@ -228,10 +275,28 @@ class CCS811( object ):
         self.__stopped = True  # in case we get interrupts early (and we do...)
         self.__tVOC = None
         self.__CO2 = None
-        self.__staleCO2 = True
-        self.__staletVOC = True
+        # generation counter of stored measurements and the generation last
+        # handed out - equality means there is nothing new to read
+        self.__gen = 0
+        self.__lastReadGen = 0
         self.__open = False
         self.__errorCode = 0
+        self.__lastEnvBytes = None
+        self.__lastModeReg = None
+        # ring buffer of the most recent measurements - the two-argument form
+        # of the deque constructor is the one MicroPython supports as well
+        self.__history = deque( [], self.HISTORY_DEPTH )
+        # serialize I2C bus access between the worker thread and callers
+        if threading is not None:
+            self.__busLock = threading.Lock()
+            # set whenever a fresh measurement has been stored internally
+            self.__readyEvent = threading.Event()
+        else:
+            self.__busLock = _NullLock()
+            self.__readyEvent = None
+        self.__dataEvent = None
+        self.__worker = None
+        self.__terminate = False
 
         # wait time after power up (see data sheet p. 7)
         # chances are it took us a lot longer to get here, but just in case...
@@ -240,9 +305,23 @@ class CCS811( object ):
         try:
 
             if interruptPin is not None:
+                if threading is not None:
+                    # keep the ISR minimal - it merely signals the worker
+                    # thread, which then performs the (blocking) I2C
+                    # transactions outside of interrupt context
+                    self.__dataEvent = threading.Event()
+                    self.__worker = threading.Thread(
+                        target=self.__workerLoop,
+                        daemon=True )
+                    self.__worker.start()
+                    callback = self.__isr
+                else:
+                    # without threading support fall back to reading the data
+                    # directly in the (soft IRQ) callback
+                    callback = self.readData
                 self.__interruptPin = IOpin( interruptPin,
                                              IOpin.INPUT_PULLUP,
-                                             self.readData,
+                                             callback,
                                              IOpin.FALLING )
             else:
                 self.__interruptPin = None
@@ -346,9 +425,12 @@ class CCS811( object ):
         @brief Perform a software reset on the CCS811.
         """
         # s. data sheet p. 25
-        self.__i2cBus.writeByte( self.__i2cAddress,
-                                 self.__SW_RESET_REG,
-                                 [0x11, 0xE5, 0x72, 0x8A] )
+        with self.__busLock:
+            self.__i2cBus.writeByte( self.__i2cAddress,
+                                     self.__SW_RESET_REG,
+                                     [0x11, 0xE5, 0x72, 0x8A] )
+        # the reset also clears the measurement mode register on the chip
+        self.__lastModeReg = None
         time.sleep( 5.0E-03 )  # s. data sheet p. 7
         return
 
@@ -393,6 +475,11 @@ class CCS811( object ):
         puts the CCS811 in boot mode.  Do NOT close the I2C bus as other devices
         may still use it - it ios a bus after all...
         """
+        if self.__worker is not None:
+            self.__terminate = True
+            self.__dataEvent.set()
+            self.__worker.join()
+            self.__worker = None
         if self.__interruptPin is not None:
             try:
                 self.__interruptPin.close()
@@ -424,9 +511,54 @@ class CCS811( object ):
         """
         modeReg = measInterval << self.__DRIVE_MODE_BIT
         modeReg |= mode << self.__INT_DATARDY_BIT
-        self.__i2cBus.writeByteReg( self.__i2cAddress,
-                                    self.__MEAS_MODE_REG,
-                                    modeReg )
+        if modeReg == self.__lastModeReg:
+            # the chip already holds this value - no need to write it again
+            return
+        with self.__busLock:
+            self.__i2cBus.writeByteReg( self.__i2cAddress,
+                                        self.__MEAS_MODE_REG,
+                                        modeReg )
+        self.__lastModeReg = modeReg
+        return
+
+
+    def __isr( self, pin=None, level=None, tick=None ):
+        """!
+        @brief Interrupt Service Routine - merely signals the worker thread.
+
+        Registered as the GPIO interrupt callback in interrupt mode whenever
+        threading is available; the arguments mirror those of readData() and
+        are unused.
+        @param pin where interrupt happened - unused
+        @param level - unused
+        @param tick - unused
+        """
+        self.__dataEvent.set()
+        return
+
+
+    def __workerLoop( self ):
+        """!
+        @brief Main loop of the worker thread, which reads the measurements
+               whenever the ISR signals that new data is ready.
+        """
+        while True:
+            self.__dataEvent.wait()
+            self.__dataEvent.clear()
+            if self.__terminate:
+                break
+            # a bus glitch must not kill the worker thread for the life of
+            # the process - retry with the same backoff dataReady uses and,
+            # if the bus stays unresponsive, drop this sample and wait for
+            # the next interrupt
+            count = self.__attempts
+            while count > 0:
+                try:
+                    self.readData()
+                    break
+                except OSError:
+                    count = count - 1
+                    time.sleep( 2 ** (self.__attempts - count) * 1.0E-04 )
         return
 
 
@@ -450,20 +582,32 @@ class CCS811( object ):
         @param number floating point number to be converted
         @return list with high and low byte of converted number as elements
         """
-        num = max( 0., min( number, 127.999 ) )
-        inum = int( num )
-        fraction = num - inum
-        floatHigh = inum << 1
-        bits = 0
-        binFrac = 1.
-        for i in range( 1, 10 ):
-            binFrac = binFrac / 2.
-            if fraction >= binFrac:
-                fraction -= binFrac
-                bits |= 1 << (9 - i)
-        floatHigh |= bits >> 8
-        floatLow = bits & 0xFF
-        return [floatHigh, floatLow]
+        # since the representation is a 16-bit integer holding the number in
+        # units of 1/512, a single scaling with rounding yields all 16 bits at
+        # once - the clip constant is the largest representable number,
+        # (128 * 512 - 1) / 512
+        num = max( 0., min( number, 127.998046875 ) )
+        bits = int( num * 512. + 0.5 )
+        return [(bits >> 8) & 0xFF, bits & 0xFF]
+
+
+    def __fetchErrorCode( self ):
+        """!
+        @brief Private method to read the error ID register - called on
+               demand when the error code is needed but has not been read yet.
+        """
+        try:
+            with self.__busLock:
+                self.__errorCode = \
+                    self.__i2cBus.readByteReg( self.__i2cAddress,
+                                               self.__ERROR_ID_REG )
+            if self.__errorCode == 0:
+                # Weird - status has error flag set but error code reads 0...
+                self.__errorCode = 1 << 7
+        except Exception:
+            # error reading the error code itself
+            self.__errorCode = 1 << 6
+        return
 
 
     @property
@@ -473,28 +617,13 @@ class CCS811( object ):
                errors indicated by the device.
         @return string with error description
         """
-        message = ''
+        if self.__errorCode is None:
+            self.__fetchErrorCode()
         if self.__errorCode == 0xFF:
             return 'All error code bits set'
-        if self.__errorCode & (1 << 0):
-            message += 'Write request to wrong register received, '
-        if self.__errorCode & (1 << 1):
-            message += 'Read request for wrong register received, '
-        if self.__errorCode & (1 << 2):
-            message += 'Invalid MeasMode received, '
-        if self.__errorCode & (1 << 3):
-            message += 'Sensor resistance reached max resistance, '
-        if self.__errorCode & (1 << 4):
-            message += 'Heater Current is not in range, '
-        # s. data sheet p. 24
-        if self.__errorCode & (1 << 5):
-            message += 'Heater supply voltage is not applied correctly, '
-        if self.__errorCode & (1 << 6):
-            message += 'Could not read error registers, '
-        if self.__errorCode & (1 << 7):
-            message += 'Unspecified error, '
-
-        return message[:-2]
+        return ', '.join( message
+                          for i, message in enumerate( self.__ERR_MSGS )
+                          if self.__errorCode & (1 << i) )
 
 
     @property
@@ -507,19 +636,18 @@ class CCS811( object ):
         @return True if there is an error condition - False otherwise
         """
         try:
-            status = self.__i2cBus.readByteReg( self.__i2cAddress,
-                                                self.__STATUS_REG )
+            with self.__busLock:
+                status = self.__i2cBus.readByteReg( self.__i2cAddress,
+                                                    self.__STATUS_REG )
             if (status & (1 << self.__ERROR_BIT)) == 0:
                 self.__errorCode = 0
                 return False
-            self.__errorCode = self.__i2cBus.readByteReg( self.__i2cAddress,
-                                                          self.__ERROR_ID_REG )
-            if self.__errorCode == 0:
-                # Weird - status has error flag set but error code reads 0...
-                self.__errorCode = 1 << 7
+            # defer reading the error ID register until somebody actually
+            # asks for the errorText - most callers only check the condition
+            self.__errorCode = None
             return True
         except Exception:
-            # error reading status or error code itself
+            # error reading the status register itself
             self.__errorCode = 1 << 6
             return True
 
@@ -561,6 +689,25 @@ class CCS811( object ):
         return
 
 
+    def setMeasInterval( self, measInterval ):
+        """!
+        @brief Change the measurement interval of a running sensor.
+
+        Only the MEAS_MODE register is written, so callers can construct the
+        object early - letting the sensor's boot sequence and burn-in start -
+        and adjust the interval later, e.g. after prompting the user.
+        @param measInterval measurement interval, one of
+               CCS811.MEAS_INT_1, CCS811.MEAS_INT_10, CCS811.MEAS_INT_60, or
+               CCS811.MEAS_INT_250MS
+        """
+        if measInterval < self.MEAS_INT_1 or \
+           measInterval > self.MEAS_INT_250MS:
+            raise ValueError( 'wrong measInterval specified' )
+        self.__measInterval = measInterval
+        self.__setModeReg( self.__mode, measInterval )
+        return
+
+
     @property
     def dataReady( self ):
         """!
@@ -579,21 +726,35 @@ class CCS811( object ):
         if self.__stopped:
             return False
 
+        data = None
         count = self.__attempts
         while count > 0:
             try:
                 # we do that count times as it sometimes times out
-                status = self.__i2cBus.readByteReg( self.__i2cAddress,
-                                                    self.__STATUS_REG )
+                with self.__busLock:
+                    # a single 8-byte read of ALG_RESULT_DATA also returns
+                    # the status and error ID registers (s. data sheet
+                    # p. 16), saving the separate status transaction
+                    data = self.__i2cBus.readBlockReg(
+                        self.__i2cAddress,
+                        self.__ALG_RESULT_DATA_REG,
+                        8 )
                 break
             except OSError:
                 count = count - 1
-        if count <= 0:
+                # back off exponentially so a misbehaving bus is not
+                # hammered at full interpreter speed
+                time.sleep( 2 ** (self.__attempts - count) * 1.0E-04 )
+        if count <= 0 or data is None:
             return False
-        ready = (status & (1 << self.__DATA_READY_BIT)) != 0
+        if len( data ) < 5:
+            return False
+        ready = (data[4] & (1 << self.__DATA_READY_BIT)) != 0
         if ready:
-            # if the device is ready, read its measurements
-            self.readData()
+            # the measurements came along in the same transaction - no
+            # second read needed
+            self.__decodeAlgResult( data )
+            self.__updateEnvData()
         return ready
 
 
@@ -603,22 +764,37 @@ class CCS811( object ):
         then be immediately read and stored internally and made available for
         examination via the CO<sub>2</sub> and tVOC properties.
 
-        Blocking method for poll mode.
+        In poll mode, the method polls the sensor at a quarter of the
+        measurement interval; in interrupt mode it blocks until the worker
+        thread signals a fresh measurement.
         """
+        if self.__interruptPin is not None and self.__readyEvent is not None:
+            # the worker thread reads the data - just wait for its signal;
+            # the timeout loop guarantees KeyboardInterrupt gets serviced
+            # promptly even on platforms where untimed waits mask signals
+            self.__readyEvent.clear()
+            while not self.__readyEvent.wait( 0.5 ):
+                pass
+            return
+        # no point hammering the bus - the sensor only produces a new sample
+        # once per measurement interval
+        period = self.MEAS_INTERVAL_SECONDS[self.__measInterval] / 4.
         while not self.dataReady:
-            pass
+            time.sleep( period )
         return
 
 
     def readData( self, pin=None, level=None, tick=None ):
         """!
-        @brief Method to read measurements from the CCS811 - used internally and
-        as an ISR for which it needs to be public and have, depending on the
-        target architecture, either a Pin object as the only argument on the
-        Pico, or the Pin number, the voltage level at the Pin, and the number of
-        microseconds since boot on the Raspberry Pi as its arguments; neither
-        one of the arguments are used here except the Pin for debug output.
-        When used internally, the method is called with no arguments.
+        @brief Method to read measurements from the CCS811 - used internally,
+        by the worker thread in interrupt mode, and, on architectures without
+        threading support, directly as an ISR for which it needs to be public
+        and have, depending on the target architecture, either a Pin object as
+        the only argument on the Pico, or the Pin number, the voltage level at
+        the Pin, and the number of microseconds since boot on the Raspberry Pi
+        as its arguments; neither one of the arguments are used here except
+        the Pin for debug output.  When used internally, the method is called
+        with no arguments.
 
         User code should not call this method.
         @param pin where interrupt happened - unused
@@ -628,9 +804,10 @@ class CCS811( object ):
                microseconds since boot - wraps around about every 72 minutes
         """
         # always read the data to make the method more versatile
-        data = self.__i2cBus.readBlockReg( self.__i2cAddress,
-                                           self.__ALG_RESULT_DATA_REG,
-                                           4 )
+        with self.__busLock:
+            data = self.__i2cBus.readBlockReg( self.__i2cAddress,
+                                               self.__ALG_RESULT_DATA_REG,
+                                               4 )
 
         if self.__stopped:
             # if this method is called while stopped, it performs a "fake read"
@@ -638,26 +815,46 @@ class CCS811( object ):
             # interrupts from the CCS811 sometimes happen when they shouldn't...
             return
 
+        self.__decodeAlgResult( data )
+        self.__updateEnvData()
 
-        try:
-            self.__CO2 = (data[0] << 8) | data[1]
-            if self.__CO2 < 400:
-                # CO2 values below 400 ppm indicate invalid measurements
-                self.__CO2 = None
-                self.__tVOC = None
-                self.__staleCO2 = True
-                self.__staletVOC = True
-            else:
-                self.__tVOC = (data[2] << 8) | data[3]
-                self.__staleCO2 = False
-                self.__staletVOC = False
-        except IndexError:
-            # We ignore errors silently
+        return
+
+
+    def __decodeAlgResult( self, data ):
+        """!
+        @brief Private method to decode the CO<sub>2</sub> and tVOC
+               measurements from an ALG_RESULT_DATA buffer and store them
+               internally.
+        @param data buffer of at least 4 bytes read from ALG_RESULT_DATA
+        """
+        # a truncated buffer is treated like an invalid measurement
+        if len( data ) >= 4:
+            self.__CO2 = int.from_bytes( bytes( data[0:2] ), 'big' )
+        else:
+            self.__CO2 = 0
+        if self.__CO2 < 400:
+            # CO2 values below 400 ppm indicate invalid measurements
             self.__CO2 = None
             self.__tVOC = None
-            self.__staleCO2 = True
-            self.__staletVOC = True
+            self.__lastReadGen = self.__gen
+        else:
+            self.__tVOC = int.from_bytes( bytes( data[2:4] ), 'big' )
+            self.__gen += 1
+            self.__history.append( (_timestamp(),
+                                    self.__CO2,
+                                    self.__tVOC) )
+            if self.__readyEvent is not None:
+                self.__readyEvent.set()
+        return
+
 
+    def __updateEnvData( self ):
+        """!
+        @brief Private method to supply the sensor with the latest temperature
+               and humidity readings for compensation, if corresponding
+               devices were provided.
+        """
         if self.__tempDevice is not None or self.__humidDevice is not None:
             # write environmental data to the sensor
             if self.__tempDevice is not None:
@@ -673,9 +870,14 @@ class CCS811( object ):
                     self.__toCCSfloat( self.__humidDevice.humidity ) )
             else:
                 envList.extend( [0x64, 0x00] )
-            self.__i2cBus.writeBlockReg( self.__i2cAddress,
-                                         self.__ENV_DATA_REG,
-                                         envList )
+            # environmental conditions change slowly - skip the I2C write
+            # whenever the bytes to send are the same as last time
+            if envList != self.__lastEnvBytes:
+                with self.__busLock:
+                    self.__i2cBus.writeBlockReg( self.__i2cAddress,
+                                                 self.__ENV_DATA_REG,
+                                                 envList )
+                self.__lastEnvBytes = envList
 
         return
 
@@ -686,7 +888,7 @@ class CCS811( object ):
         @brief Works as a property to get the last CO<sub>2</sub> measurement
                obtained from device in ppm.
         """
-        self.__staleCO2 = True
+        self.__lastReadGen = self.__gen
         return self.__CO2
 
 
@@ -696,10 +898,24 @@ class CCS811( object ):
         @brief Works as a property to get the last tVOC measurement obtained
                from device in ppb.
         """
-        self.__staletVOC = True
+        self.__lastReadGen = self.__gen
         return self.__tVOC
 
 
+    @property
+    def readings( self ):
+        """!
+        @brief Works as a property to get the last CO<sub>2</sub> and tVOC
+               measurements as one (CO2, tVOC) tuple.
+
+        Obtaining both values through a single property guarantees that they
+        stem from the same sample, which two back-to-back reads of the CO2
+        and tVOC properties cannot do in interrupt mode.
+        """
+        self.__lastReadGen = self.__gen
+        return (self.__CO2, self.__tVOC)
+
+
     @property
     def staleMeasurements( self ):
         """!
@@ -711,7 +927,39 @@ class CCS811( object ):
         be used in interrupt mode in the (rare) cases when this becomes
         relevant.
         """
-        return self.__staleCO2 | self.__staletVOC
+        return self.__lastReadGen == self.__gen
+
+
+    @property
+    def dataReadyEvent( self ):
+        """!
+        @brief Works as a property to get the threading.Event the worker
+               thread sets whenever it has stored a fresh measurement.
+
+        The event is only available in interrupt mode on architectures with
+        threading support; the property returns None otherwise.  Callers can
+        clear() the event and then wait() on it instead of spinning on
+        staleMeasurements, which costs no CPU while idle.
+        """
+        if self.__interruptPin is None:
+            # in poll mode nothing fires the event unless somebody happens
+            # to poll - do not offer it as something to wait on
+            return None
+        return self.__readyEvent
+
+
+    @property
+    def history( self ):
+        """!
+        @brief Works as a property to get a snapshot of the most recent
+               measurements.
+
+        Each entry is a tuple (timestamp, CO2, tVOC) with the timestamp taken
+        from time.monotonic_ns() where available and time.time() otherwise.
+        The buffer holds at most HISTORY_DEPTH entries, oldest first, and
+        reading it does not mark any measurements as stale.
+        """
+        return tuple( self.__history )
 
 
 
@@ -45,50 +45,99 @@
 
 import sys
 
-try:
-    import os.path
-    import os
-    sys.path.append( os.path.join( os.path.dirname( __file__ ),
-                                   os.pardir ) )
-    sys.path.append( os.path.join( os.path.dirname( __file__ ),
-                                   os.pardir,
-                                   os.pardir,
-                                   'GPIO_AL' ) )
-except ImportError:
-    # on the Pico there is no os.path but all modules are in the same directory
-    pass
-
-from GPIO_AL import *
-from CCS811 import *
+# only adjust sys.path when run as a script - importing this file (e.g. from
+# a test harness) must not have side effects on the module search path
+if __name__ == "__main__":
+    import _pathsetup
+
+# explicit imports keep __main__'s global dict small and, on the Pico,
+# avoid pulling unused symbols into RAM
+from GPIO_AL import I2Cbus, GPIOError, isPico
+from CCS811 import CCS811
+
+import time
+
+##! number of clock ticks per second as returned by _monotonicNs()
+_NS_PER_SEC = 1000000000
 
 try:
-    import traceback
-    exitChar = 'Ctrl-C'
-except:
-    traceback = None
-    # keyboard interrupt on Raspberry Pi Pico is broken and gets "stuck"
-    # so new inputs are also interrupted - use 'q' instead where possible
-    exitChar = 'q'
+    # integer nanosecond clock - cannot jump, and integer compares are much
+    # cheaper than float math on the FPU-less RP2040
+    _monotonicNs = time.monotonic_ns
+except AttributeError:
+    # MicroPython has no monotonic_ns - scale its millisecond ticks instead;
+    # ticks_ms wraps only after several days, far beyond any window used here
+    def _monotonicNs( _ms=time.ticks_ms ):
+        return _ms() * 1000000
+
+from _platform import printExc, exitChar
+
+if sys.implementation.name == 'micropython':
+    # MicroPython has no argparse - the Pico always prompts interactively
+    argparse = None
+else:
+    import argparse
+
+# banner strings the sleep/wake test loops print over and over - built once
+# at import time instead of in each loop body (MicroPython does not
+# constant-fold adjacent string literals as aggressively as CPython)
+_SLEEP_POLL_BANNER = 'sending sensor to sleep (should not see measurements)...'
+_SLEEP_IRQ_BANNER = ( 'sending sensor to sleep (expect no measurements and no '
+                      'interrupt signals)...' )
+_WAKE_BANNER = 'waking sensor up again (expect new measurements)!'
+
+##! measurement interval selection menu - one string, one write() per display
+_MEAS_MENU = '\n'.join( ['Enter measurement interval',
+                         f'1 s .... {CCS811.MEAS_INT_1} (default)',
+                         f'10 s ... {CCS811.MEAS_INT_10}',
+                         f'60 s ... {CCS811.MEAS_INT_60}',
+                         f'250 ms . {CCS811.MEAS_INT_250MS}'] )
 
 #  main program - Unit Test
 
+##! Freezing point in deg F
+_F0 = 32.
+##! Absolute zero in deg C
+_T0 = -273.15
+##! ratio of difference of deg C to deg F
+_CF_RATIO = 9. / 5.
+##! reciprocal of _CF_RATIO - a multiplication is cheaper than a division
+_INV_CF_RATIO = 5. / 9.
+
+
 class Temperature( object ):
 
+    # slots spare the per-instance attribute dict - on the Pico that is
+    # around a hundred bytes of RAM per instance
+    __slots__ = ('__kelvin', '__celsius', '__fahrenheit')
+
     ##! Freezing point in deg F
-    F0 = 32
+    F0 = _F0
     ##! Absolute zero in deg C
-    T0 = -273.15
+    T0 = _T0
     ##! ratio of difference of deg C to deg F
-    CF_RATIO = 9. / 5.
+    CF_RATIO = _CF_RATIO
+    ##! reciprocal of CF_RATIO - a multiplication is cheaper than a division
+    INV_CF_RATIO = _INV_CF_RATIO
 
     def __init__( self, kelvin=None, celsius=None, fahrenheit=None ):
+        # module-level constants are a plain global lookup instead of a
+        # class-attribute dereference through the instance
         self.__kelvin = None
         if fahrenheit is not None:
-            self.__kelvin = (fahrenheit - self.F0) / self.CF_RATIO - self.T0
+            self.__kelvin = (fahrenheit - _F0) * _INV_CF_RATIO - _T0
         elif celsius is not None:
-            self.__kelvin = celsius - self.T0
+            self.__kelvin = celsius - _T0
         elif kelvin is not None:
             self.__kelvin = kelvin
+        # precompute the other representations once so that the properties
+        # become plain attribute reads
+        if self.__kelvin is not None:
+            self.__celsius = self.__kelvin + _T0
+            self.__fahrenheit = self.__celsius * _CF_RATIO + _F0
+        else:
+            self.__celsius = None
+            self.__fahrenheit = None
         return
 
     @property
@@ -97,14 +146,17 @@ class Temperature( object ):
 
     @property
     def celsius( self ):
-        return self.__kelvin + self.T0
+        return self.__celsius
 
     @property
     def fahrenheit( self ):
-        return (self.__kelvin + self.T0) * self.CF_RATIO + self.F0
+        return self.__fahrenheit
 
 
 class Humidity( object ):
+
+    __slots__ = ('__humidity',)
+
     def __init__( self, humidity ):
         self.__humidity = humidity
         return
@@ -118,6 +170,85 @@ if __name__ == "__main__":
 
     DEBUG = True
 
+    def parseCommandLine():
+        """!
+        @brief Parse the command line arguments - the defaults match the
+               interactive "hit Enter" defaults.
+        """
+        parser = argparse.ArgumentParser(
+            description='Unit Test for the CCS811 driver' )
+        parser.add_argument( '--sda', type=int,
+                             default=I2Cbus.DEFAULT_DATA_PIN,
+                             help='sda Pin number' )
+        parser.add_argument( '--scl', type=int,
+                             default=I2Cbus.DEFAULT_CLOCK_PIN,
+                             help='scl Pin number' )
+        parser.add_argument( '--mode', type=int,
+                             default=I2Cbus.DEFAULT_MODE,
+                             help='I2C mode - {0} for HW, {1} for SW'
+                                  ''.format( I2Cbus.HARDWARE_MODE,
+                                             I2Cbus.SOFTWARE_MODE ) )
+        parser.add_argument( '--freq', type=int,
+                             default=I2Cbus.DEFAULT_I2C_FREQ,
+                             help='I2C frequency in Hz' )
+        parser.add_argument( '--attempts', type=int,
+                             default=I2Cbus.ATTEMPTS,
+                             help='number of I2C attempts' )
+        parser.add_argument( '--addr', type=lambda s: int( s, 0 ),
+                             default=CCS811.DEFAULT_ADDR,
+                             help='CCS811 device address' )
+        parser.add_argument( '--interrupt-pin', type=int, default=None,
+                             help='interrupt Pin - omit for poll mode' )
+        parser.add_argument( '--wakeup-pin', type=int, default=None,
+                             help='wakeup Pin - omit to disable wakeup' )
+        parser.add_argument( '--interval', type=int,
+                             default=CCS811.MEAS_INT_1,
+                             help='measurement interval selector' )
+        parser.add_argument( '--temp-f', type=float, default=None,
+                             help='temperature in deg F for dummy temp '
+                                  'object' )
+        parser.add_argument( '--humidity', type=float, default=None,
+                             help='humidity in %% for dummy humidity '
+                                  'object' )
+        return parser.parse_args()
+
+
+    def askInt( prompt, default, base=10 ):
+        """!
+        @brief Prompt for an integer and return a default on empty or
+               invalid input.
+
+        The empty-input fast path avoids raising and catching a ValueError
+        for every prompt the user just acknowledges with Enter.
+        @param prompt text to present to the user
+        @param default value to return on empty or invalid input
+        @param base number base for the conversion
+        """
+        text = input( prompt ).strip()
+        if not text:
+            return default
+        try:
+            return int( text, base )
+        except ValueError:
+            return default
+
+
+    def askFloat( prompt, default=None ):
+        """!
+        @brief Prompt for a float and return a default on empty or invalid
+               input.
+        @param prompt text to present to the user
+        @param default value to return on empty or invalid input
+        """
+        text = input( prompt ).strip()
+        if not text:
+            return default
+        try:
+            return float( text )
+        except ValueError:
+            return default
+
+
     def main():
         """!
         @brief Unit Test for CCS811.
@@ -125,55 +256,67 @@ if __name__ == "__main__":
 
         i2cBus = None
         aqSensor = None
-
-        print( 'In all cases accept default values (in parentheses) by '
-               'hitting Enter\n' )
+        retcode = 0
+
+        # prompt interactively only when no arguments were given and stdin
+        # is a terminal - otherwise run with the (parsed) defaults so the
+        # test can be scripted
+        if argparse is not None:
+            args = parseCommandLine()
+            interactive = len( sys.argv ) <= 1 and sys.stdin.isatty()
+        else:
+            args = None
+            interactive = True
+
+        if not interactive and hasattr( sys.stdout, 'reconfigure' ):
+            # in scripted runs, block-buffer stdout so that high-rate
+            # (250 ms) sampling does not pay one write() syscall per line
+            sys.stdout.reconfigure( line_buffering=False,
+                                    write_through=False )
+
+        if interactive:
+            print( 'In all cases accept default values (in parentheses) by '
+                   'hitting Enter\n' )
 
         try:
             while True:
-                print( '\nSet up I2C bus parameters' )
-                print( '-------------------------' )
+                print( '\nSet up I2C bus parameters\n'
+                       '-------------------------' )
                 print( 'Enter {0} to end this test\n'
                        ''.format( exitChar ) )
                 try:
-                    try:
-                        sdaPin = int( input(
+                    if not interactive:
+                        sdaPin = args.sda
+                        sclPin = args.scl
+                        mode = args.mode
+                        frequency = args.freq
+                        attempts = args.attempts
+                    else:
+                        sdaPin = askInt(
                             '\nsda Pin ({0}): '
-                            ''.format( I2Cbus.DEFAULT_DATA_PIN ) ) )
-                    except ValueError:
-                        sdaPin = I2Cbus.DEFAULT_DATA_PIN
-
-                    try:
-                        sclPin = int( input(
+                            ''.format( I2Cbus.DEFAULT_DATA_PIN ),
+                            I2Cbus.DEFAULT_DATA_PIN )
+                        sclPin = askInt(
                             'scl Pin ({0}): '
-                            ''.format( I2Cbus.DEFAULT_CLOCK_PIN ) ) )
-                    except ValueError:
-                        sclPin = I2Cbus.DEFAULT_CLOCK_PIN
-
-                    try:
-                        mode = int( input( 'mode - {0} for HW, {1} for SW ('
-                                           '{2})'
-                                           ''.format( I2Cbus.HARDWARE_MODE,
-                                                      I2Cbus.SOFTWARE_MODE,
-                                                      I2Cbus.DEFAULT_MODE ) ) )
-                    except ValueError:
-                        mode = I2Cbus.DEFAULT_MODE
-
-                    if mode == I2Cbus.SOFTWARE_MODE or isPico():
-                        try:
-                            frequency = int( input(
+                            ''.format( I2Cbus.DEFAULT_CLOCK_PIN ),
+                            I2Cbus.DEFAULT_CLOCK_PIN )
+                        mode = askInt(
+                            'mode - {0} for HW, {1} for SW ({2})'
+                            ''.format( I2Cbus.HARDWARE_MODE,
+                                       I2Cbus.SOFTWARE_MODE,
+                                       I2Cbus.DEFAULT_MODE ),
+                            I2Cbus.DEFAULT_MODE )
+                        if mode == I2Cbus.SOFTWARE_MODE or isPico():
+                            frequency = askInt(
                                 'frequency in Hz ({0} Hz): '
-                                ''.format( I2Cbus.DEFAULT_I2C_FREQ ) ) )
-                        except ValueError:
+                                ''.format( I2Cbus.DEFAULT_I2C_FREQ ),
+                                I2Cbus.DEFAULT_I2C_FREQ )
+                        else:
                             frequency = I2Cbus.DEFAULT_I2C_FREQ
-                    else:
-                        frequency = I2Cbus.DEFAULT_I2C_FREQ
-
-                    try:
-                        attempts = int( input( 'number of attempts {0}: '
-                                               ''.format( I2Cbus.ATTEMPTS ) ) )
-                    except ValueError:
-                        attempts = I2Cbus.ATTEMPTS
+                        attempts = askInt(
+                            'number of attempts {0}: '
+                            ''.format( I2Cbus.ATTEMPTS ),
+                            I2Cbus.ATTEMPTS )
                 except KeyboardInterrupt:
                     print()
                     break
@@ -184,61 +327,63 @@ if __name__ == "__main__":
                     break
                 except (ValueError, GPIOError) as e:
                     print( e )
+                    if not interactive:
+                        # a scripted run would retry with the very same
+                        # parameters forever - fail the run instead
+                        retcode = 1
+                        break
                     continue
 
             while i2cBus is not None:
-                print( '\nSet up CCS811 sensor parameters' )
-                print( '-------------------------------' )
+                print( '\nSet up CCS811 sensor parameters\n'
+                       '-------------------------------' )
                 print( 'Again, enter {0} to end this input and '
                        'start over\n'.format( exitChar ) )
                 try:
-                    try:
-                        i2cAddr = int( input( 'Enter CCS811 device address in '
-                                              'hex (0x{0:02X}): '
-                                              ''.format( CCS811.DEFAULT_ADDR )
-                                            ), 16 )
-                    except ValueError:
-                        i2cAddr = CCS811.DEFAULT_ADDR
-
-                    try:
-                        interruptPin = int( input( 'Enter interrupt Pin or '
-                                                   'empty line for poll '
-                                                   'mode: ' ) )
-                    except ValueError:
-                        interruptPin = None
-
-                    try:
-                        wakeupPin = int( input( 'Enter wakeup Pin or empty '
-                                                'line: ' ) )
-                    except ValueError:
-                        wakeupPin = None
-
-                    print( 'Enter measurement interval' )
-                    print( '1 s .... {0} (default)'
-                           ''.format( CCS811.MEAS_INT_1 ) )
-                    print( '10 s ... {0}'.format( CCS811.MEAS_INT_10 ) )
-                    print( '60 s ... {0}'.format( CCS811.MEAS_INT_60 ) )
-                    print( '250 ms . {0}'.format( CCS811.MEAS_INT_250MS ) )
-                    try:
-                        measInterval = int( input( '> ' ) )
-                    except ValueError:
-                        measInterval = CCS811.MEAS_INT_1
-
-                    try:
-                        temp = float( input( 'Enter temperature in deg F to '
-                                             'use dummy temp object or empty '
-                                             'line: ' ) )
-                        tempObj = Temperature( fahrenheit=float( temp ) )
-                    except ValueError:
-                        tempObj = None
+                    if not interactive:
+                        i2cAddr = args.addr
+                        interruptPin = args.interrupt_pin
+                        wakeupPin = args.wakeup_pin
+                        measInterval = args.interval
+                        if args.temp_f is not None:
+                            tempObj = Temperature( fahrenheit=args.temp_f )
+                        else:
+                            tempObj = None
+                        if args.humidity is not None:
+                            humObj = Humidity( args.humidity )
+                        else:
+                            humObj = None
+                    else:
+                        i2cAddr = askInt(
+                            'Enter CCS811 device address in hex (0x{0:02X}): '
+                            ''.format( CCS811.DEFAULT_ADDR ),
+                            CCS811.DEFAULT_ADDR,
+                            16 )
+                        interruptPin = askInt(
+                            'Enter interrupt Pin or empty line for poll '
+                            'mode: ',
+                            None )
+                        wakeupPin = askInt(
+                            'Enter wakeup Pin or empty line: ',
+                            None )
+
+                        print( _MEAS_MENU )
+                        measInterval = askInt( '> ', CCS811.MEAS_INT_1 )
+
+                        temp = askFloat( 'Enter temperature in deg F to use '
+                                         'dummy temp object or empty '
+                                         'line: ' )
+                        if temp is not None:
+                            tempObj = Temperature( fahrenheit=temp )
+                        else:
+                            tempObj = None
 
-                    try:
-                        humid = float( input( 'Enter humidity in % to use '
-                                              'dummy humidity object or '
-                                              'empty line: ' ) )
-                        humObj = Humidity( float( humid ) )
-                    except ValueError:
-                        humObj = None
+                        humid = askFloat( 'Enter humidity in % to use dummy '
+                                          'humidity object or empty line: ' )
+                        if humid is not None:
+                            humObj = Humidity( humid )
+                        else:
+                            humObj = None
                 except KeyboardInterrupt:
                     print()
                     break
@@ -255,102 +400,130 @@ if __name__ == "__main__":
                            ''.format( aqSensor ) )
 
                 except ValueError as e:
-                    if traceback is not None:
-                        traceback.print_exc()
-                    else:
-                        print( '\nCCS811 ERROR: {0}'.format( e ) )
+                    printExc()
                     try:
                         del aqSensor
                     except:
                         pass
                     aqSensor = None
+                    if not interactive:
+                        # a scripted run would retry with the very same
+                        # parameters forever - fail the run instead
+                        retcode = 1
+                        break
                     continue
                 except GPIOError as e:
-                    if traceback is not None:
-                        traceback.print_exc()
-                    else:
-                        print( '\nGPIO ERROR: {0}'.format( e ) )
+                    printExc()
                     try:
                         del aqSensor
                     except:
                         pass
                     aqSensor = None
+                    if not interactive:
+                        # a scripted run would retry with the very same
+                        # parameters forever - fail the run instead
+                        retcode = 1
+                        break
                     continue
 
                 try:
                     print( 'Enter Ctrl-C to end data acquisition' )
-                    answer = input( 'Hit Enter to start test or q to quit' )
-                    if answer == 'q':
-                        break
+                    if interactive:
+                        answer = input( 'Hit Enter to start test or q to '
+                                        'quit' )
+                        if answer == 'q':
+                            break
+                    # property getters hoisted out of the hot loops - see
+                    # _common.py
+                    _readings = type( aqSensor ).readings.fget
+                    _stale = type( aqSensor ).staleMeasurements.fget
+                    _ready = type( aqSensor ).dataReady.fget
+                    _err = type( aqSensor ).errorCondition.fget
                     if wakeupPin is None:
                         if interruptPin is None:
                             print( 'Testing in regular poll mode...' )
                             while True:
                                 aqSensor.waitforData()
-                                print( 'CO2: {0} ppm, total VOC: '
-                                       '{1} ppb'.format( aqSensor.CO2,
-                                                         aqSensor.tVOC ) )
-                                if aqSensor.errorCondition:
+                                co2, tVOC = _readings( aqSensor )
+                                print( f'CO2: {co2} ppm, '
+                                       f'total VOC: {tVOC} ppb' )
+                                if _err( aqSensor ):
                                     print( aqSensor.errorText )
                         else:
                             print( 'Testing in regular interrupt mode...' )
+                            # the ISR stores fresh measurements on its own -
+                            # checking more often than the sensor samples
+                            # just wastes CPU and bus bandwidth
+                            idle = CCS811.MEAS_INTERVAL_SECONDS[measInterval] \
+                                   / 20.
                             while True:
-                                if not aqSensor.staleMeasurements:
-                                    print( 'CO2: {0} ppm, total VOC: '
-                                           '{1} ppb'.format( aqSensor.CO2,
-                                                             aqSensor.tVOC ) )
-                                if aqSensor.errorCondition:
-                                    print( aqSensor.errorText )
+                                if not _stale( aqSensor ):
+                                    co2, tVOC = _readings( aqSensor )
+                                    print( f'CO2: {co2} ppm, '
+                                           f'total VOC: {tVOC} ppb' )
+                                    if _err( aqSensor ):
+                                        print( aqSensor.errorText )
+                                else:
+                                    time.sleep( idle )
                     else:
                         print( 'Testing sleep/wake functionality in ', end='' )
+                        # no need to check more often than the sensor can
+                        # produce samples - idle in between to spare the CPU
+                        idle = CCS811.MEAS_INTERVAL_SECONDS[measInterval] / 20.
                         if interruptPin is None:
                             print( 'poll mode...' )
                             while True:
-                                startTime = time.time()
-                                while time.time() - startTime < 10:
+                                deadline = _monotonicNs() + 10 * _NS_PER_SEC
+                                while _monotonicNs() < deadline:
                                     aqSensor.waitforData()
-                                    print( 'CO2: {0} ppm, total VOC: {1} '
-                                           'ppb'.format( aqSensor.CO2,
-                                                         aqSensor.tVOC ) )
-                                print( 'sending sensor to sleep '
-                                       '(should not see measurements)...' )
+                                    co2, tVOC = _readings( aqSensor )
+                                    print( f'CO2: {co2} ppm, '
+                                           f'total VOC: {tVOC} ppb' )
+                                print( _SLEEP_POLL_BANNER )
                                 aqSensor.sleep()
-                                startTime = time.time()
-                                while time.time() - startTime < 10:
-                                    if aqSensor.dataReady:
-                                        print( 'CO2: {0} ppm, total VOC: {1} '
-                                               'ppb'.format( aqSensor.CO2,
-                                                             aqSensor.tVOC ) )
-                                print( 'waking sensor up again '
-                                       '(expect new measurements)!' )
+                                deadline = _monotonicNs() + 10 * _NS_PER_SEC
+                                while _monotonicNs() < deadline:
+                                    if _ready( aqSensor ):
+                                        co2, tVOC = _readings( aqSensor )
+                                        print( f'CO2: {co2} ppm, '
+                                               f'total VOC: {tVOC} ppb' )
+                                    else:
+                                        time.sleep( idle )
+                                print( _WAKE_BANNER )
                                 aqSensor.wake()
                         else:
                             print( 'interrupt mode...' )
                             while True:
-                                startTime = time.time()
-                                while time.time() - startTime < 20:
-                                    if not aqSensor.staleMeasurements:
-                                        print( 'CO2: {0} ppm, total VOC: {1} '
-                                               'ppb'.format( aqSensor.CO2,
-                                                             aqSensor.tVOC ) )
-                                print( 'sending sensor to sleep '
-                                       '(expect no measurements '
-                                       'and no interrupt signals)...' )
+                                deadline = _monotonicNs() + 20 * _NS_PER_SEC
+                                while _monotonicNs() < deadline:
+                                    if not _stale( aqSensor ):
+                                        co2, tVOC = _readings( aqSensor )
+                                        print( f'CO2: {co2} ppm, '
+                                               f'total VOC: {tVOC} ppb' )
+                                    else:
+                                        time.sleep( idle )
+                                print( _SLEEP_IRQ_BANNER )
                                 aqSensor.sleep()
-                                startTime = time.time()
-                                while time.time() - startTime < 20:
-                                    if not aqSensor.staleMeasurements:
-                                        print( 'CO2: {0} ppm, total VOC: {1} '
-                                               'ppb'.format( aqSensor.CO2,
-                                                             aqSensor.tVOC ) )
-                                print( 'waking sensor up again '
-                                       '(expect new measurements)!' )
+                                deadline = _monotonicNs() + 20 * _NS_PER_SEC
+                                while _monotonicNs() < deadline:
+                                    if not _stale( aqSensor ):
+                                        co2, tVOC = _readings( aqSensor )
+                                        print( f'CO2: {co2} ppm, '
+                                               f'total VOC: {tVOC} ppb' )
+                                    else:
+                                        time.sleep( idle )
+                                print( _WAKE_BANNER )
                                 aqSensor.wake()
                 except KeyboardInterrupt:
                     print( '\nGot keyboard interrupt' )
                     if aqSensor is not None:
                         aqSensor.close()
                         aqSensor = None
+                    if not interactive:
+                        # in scripted mode there are no prompts to pause at -
+                        # re-entering the setup loop would just restart the
+                        # same test, so one pass is the whole run
+                        break
 
         except KeyboardInterrupt:
             if aqSensor is not None:
@@ -358,20 +531,11 @@ if __name__ == "__main__":
                 aqSensor = None
 
         except ValueError as e:
-            if traceback is not None:
-                traceback.print_exc()
-            else:
-                print( '\nCCS811 ERROR: {0}'.format( e ) )
+            printExc()
         except GPIOError as e:
-            if traceback is not None:
-                traceback.print_exc()
-            else:
-                print( '\nGPIO ERROR: {0}'.format( e ) )
+            printExc()
         except Exception as e:
-            if traceback is not None:
-                traceback.print_exc()
-            else:
-                print( '\nERROR: {0}'.format( e ) )
+            printExc()
 
         print( '\nClosing CCS811 and I2Cbus objects (in that order)...' )
         if aqSensor is not None:
@@ -380,7 +544,7 @@ if __name__ == "__main__":
             i2cBus.close()
 
         print( '\nExiting...\n' )
-        return 0
+        return retcode
 
 
     sys.exit( int( main() or 0 ) )
@@ -36,76 +36,75 @@
 import sys
 import time
 
-try:
-    import os.path
-    import os
-    sys.path.append( os.path.join( os.path.dirname( __file__ ),
-                                   os.pardir ) )
-    sys.path.append( os.path.join( os.path.dirname( __file__ ),
-                                   os.pardir,
-                                   os.pardir,
-                                   'GPIO_AL' ) )
-except ImportError:
-    # on the Pico there is no os.path but all modules are in the same directory
-    pass
+import _pathsetup
 
 
 from GPIO_AL import *
 from CCS811 import *
 
-try:
-    import traceback
-except:
-    traceback = None
+from _common import run
 
 #  main program - Quick And Dirty Poll Test
 
 if __name__ == "__main__":
 
 
-    def main():
+    def setup( i2cBus ):
         """!
-        @brief generate trigger signal when CCS811 error occurs.
+        @brief Create the trigger Pin and the CCS811 sensor in poll mode.
+        @param i2cBus open I2Cbus object
         """
-        aqSensor = None
-        i2cBus = None
-        
-        try:
+        global triggerPin
+
+        pin = int( input( 'Enter Pin number for trigger signal: ' ) )
+        triggerPin = IOpin( pin, IOpin.OUTPUT )
+        print( f'Using trigger Pin: {triggerPin}' )
+        triggerPin.level = IOpin.LOW
 
-            # use the I2C bus with default parameters only
-            i2cBus = I2Cbus()
-            print( 'Using I2C bus: {0}'.format( i2cBus ) )
+        return CCS811( i2cBus )
 
-            pin = int( input( 'Enter Pin number for trigger signal: ' ) )
-            triggerPin = IOpin( pin, IOpin.OUTPUT )
-            print( 'Using trigger Pin: {0}'.format( triggerPin ) )
-            triggerPin.level = IOpin.LOW
 
-            aqSensor = CCS811( i2cBus )
+    def measureLoop( aqSensor ):
+        """!
+        @brief Poll forever, pulsing the trigger Pin on every error.
+        @param aqSensor CCS811 object to poll
+        """
+        # property getters hoisted out of the loop - see _common.py
+        _ready = type( aqSensor ).dataReady.fget
+        _err = type( aqSensor ).errorCondition.fget
+        _stale = type( aqSensor ).staleMeasurements.fget
+        _readings = type( aqSensor ).readings.fget
+        # sleep away most of a measurement interval after each fresh
+        # sample - polling faster cannot yield new data
+        idle = 0.9 * CCS811.MEAS_INTERVAL_SECONDS[CCS811.MEAS_INT_1]
+        # suppress consecutive identical lines - stable readings appear
+        # as a counted repeat instead
+        lastReadings = None
+        repeats = 0
+        try:
             while True:
-                _ = aqSensor.dataReady
-                if aqSensor.errorCondition:
+                _ = _ready( aqSensor )
+                if _err( aqSensor ):
                     triggerPin.level = IOpin.HIGH
                     triggerPin.level = IOpin.LOW
                     print( "Error: " + aqSensor.errorText )
-                if not aqSensor.staleMeasurements:
-                    print( 'CO2: {0} ppm, total VOC: {1} '
-                           'ppb'.format( aqSensor.CO2, aqSensor.tVOC ) )
-        except KeyboardInterrupt:
-            pass
-        except Exception as e:
-            if traceback is not None:
-                traceback.print_exc()
-            else:
-                print( e )
-
-        print( 'Exiting...' )
-        try:
-            aqSensor.close()
-        except:
-            pass
-        i2cBus.close()
-
-        return 0
-
-    sys.exit( int( main() or 0 ) )
+                if not _stale( aqSensor ):
+                    readings = _readings( aqSensor )
+                    if readings == lastReadings:
+                        repeats += 1
+                    else:
+                        if repeats:
+                            print( f'  (x{repeats + 1})' )
+                            repeats = 0
+                        lastReadings = readings
+                        co2, tVOC = readings
+                        print( f'CO2: {co2} ppm, total VOC: {tVOC} ppb' )
+                    time.sleep( idle )
+        finally:
+            # close the repeat count when the loop ends (usually via
+            # KeyboardInterrupt) so the output reports every measurement
+            if repeats:
+                print( f'  (x{repeats + 1})' )
+        return
+
+    sys.exit( run( setup, measureLoop ) )
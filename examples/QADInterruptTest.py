@@ -41,75 +41,76 @@
 
 import sys
 
-try:
-    import os.path
-    import os
-    sys.path.append( os.path.join( os.path.dirname( __file__ ),
-                                   os.pardir ) )
-    sys.path.append( os.path.join( os.path.dirname( __file__ ),
-                                   os.pardir, 
-                                   os.pardir, 
-                                   'GPIO_AL' ) )
-except ImportError:
-    # on the Pico there is no os.path but all modules are in the same directory
-    pass
+import _pathsetup
 
 
 from GPIO_AL import *
 from CCS811 import *
 
-try:
-    import traceback
-except:
-    traceback = None
+from _common import run
+from _platform import native
 
 #  main program - Quick And Dirty Interrupt Test
 
 if __name__ == "__main__":
-    
-    
-    def main():
+
+
+    @native
+    def measureLoop( aqSensor ):
         """!
-        @brief Quick And Dirty Interrupt Test for CCS811.
+        @brief Print every fresh measurement the ISR stores.
+
+        On the Pico, MicroPython's native code emitter compiles this loop to
+        machine code and skips the bytecode dispatch overhead.
+        @param aqSensor CCS811 object operated in interrupt mode
         """
+        # property getters hoisted out of the loop - see _common.py
+        _stale = type( aqSensor ).staleMeasurements.fget
+        _readings = type( aqSensor ).readings.fget
+        _err = type( aqSensor ).errorCondition.fget
+        # park on the worker thread's data-ready event while idle - zero CPU
+        # instead of spinning on staleMeasurements (None on MicroPython)
+        event = aqSensor.dataReadyEvent
+        idle = CCS811.MEAS_INTERVAL_SECONDS[measInterval] / 20.
+        while True:
+            if event is not None and _stale( aqSensor ):
+                # the timeout lets the error check below run even when the
+                # sensor stops asserting nINT, and keeps the wait
+                # interruptible with Ctrl-C on all platforms
+                event.clear()
+                event.wait( 2 )
+            if not _stale( aqSensor ):
+                co2, tVOC = _readings( aqSensor )
+                print( f'CO2: {co2} ppm, total VOC: {tVOC} ppb' )
+            elif event is None:
+                # no threading support - pace the polling instead
+                time.sleep( idle )
+            if _err( aqSensor ):
+                print( aqSensor.errorText )
+        return
 
-        # use the I2C bus with default parameters only
-        i2cBus = I2Cbus()
-        print( 'Using I2C bus: {0}'.format( i2cBus ) )
+
+    def setup( i2cBus ):
+        """!
+        @brief Create the CCS811 sensor in interrupt mode.
+        @param i2cBus open I2Cbus object
+        """
+        global measInterval
 
         # CCS811 interrupt Pin hard coded as 6
         interruptPin = 6
-        
-        input( 'Connect CCS811 interrupt Pin to Pin {0} of the Raspberry Pi '
-               ' and hit Enter when done'.format( interruptPin ) )
-        
-        interval = int( input( 'Enter measurement interval (1, 2, or 3'
-                               ' for 1 s, 10 s, or 60 s): ' ) )
+
+        input( f'Connect CCS811 interrupt Pin to Pin {interruptPin} of '
+               'the Raspberry Pi and hit Enter when done' )
+
+        measInterval = int( input( 'Enter measurement interval (1, 2, or 3'
+                                   ' for 1 s, 10 s, or 60 s): ' ) )
 
         aqSensor = CCS811( i2cBus,
-                           measInterval=interval,
+                           measInterval=measInterval,
                            interruptPin=interruptPin )
-        
+
         print( 'Measurements obtained under interrupt control:' )
-        try:
-            while True:
-                if not aqSensor.staleMeasurements:
-                    print( 'CO2: {0} ppm, total VOC: '
-                            '{1} ppb'.format( aqSensor.CO2, aqSensor.tVOC ) )
-                if aqSensor.errorCondition:
-                    print( aqSensor.errorText )
-        except KeyboardInterrupt:
-            pass
-        except Exception as e:
-            if traceback is not None:
-                traceback.print_exc()
-            else:
-                print( e )
-        
-        print( 'Exiting...' )
-        aqSensor.close()
-        i2cBus.close()
-
-        return 0
-
-    sys.exit( int( main() or 0 ) )
+        return aqSensor
+
+    sys.exit( run( setup, measureLoop ) )
@@ -41,68 +41,139 @@
 
 import sys
 
-try:
-    import os.path
-    import os
-    sys.path.append( os.path.join( os.path.dirname( __file__ ),
-                                   os.pardir ) )
-    sys.path.append( os.path.join( os.path.dirname( __file__ ),
-                                   os.pardir,
-                                   os.pardir,
-                                   'GPIO_AL' ) )
-except ImportError:
-    # on the Pico there is no os.path but all modules are in the same directory
-    pass
+import _pathsetup
 
 
 from GPIO_AL import *
 from CCS811 import *
 
+from _common import run
+from _platform import native
+
+##! number of measurement lines to collect before writing them to stdout
+BATCH_SIZE = 16
+
+##! maximal time in seconds a collected line may wait before being written
+FLUSH_SECONDS = 2
+
+##! CCS811 hardware ID register (see data sheet)
+HW_ID_REG = 0x20
+
+##! content the CCS811 hardware ID register is expected to hold
+HW_ID = 0x81
+
 try:
-    import traceback
-except:
-    traceback = None
+    _monotonic = time.monotonic
+except AttributeError:
+    # MicroPython provides no monotonic clock in its time module
+    _monotonic = time.time
 
 #  main program - Quick And Dirty Poll Test
 
 if __name__ == "__main__":
 
 
-    def main():
+    @native
+    def measureLoop( aqSensor ):
         """!
-        @brief Quick And Dirty Poll Test for CCS811.
-        """
-        i2cBus = None
-        aqSensor = None
+        @brief Poll the sensor forever and print every fresh measurement.
 
+        On the Pico, MicroPython's native code emitter compiles this loop to
+        machine code and skips the bytecode dispatch overhead.
+        @param aqSensor CCS811 object to poll
+        """
+        # property getters hoisted out of the loop - see _common.py
+        _ready = type( aqSensor ).dataReady.fget
+        _readings = type( aqSensor ).readings.fget
+        _err = type( aqSensor ).errorCondition.fget
+        # collect measurement lines and emit them in one write per batch -
+        # this amortizes the stdout syscall over BATCH_SIZE samples
+        _write = sys.stdout.write
+        buffer = []
+        # the sensor produces one sample per measurement interval - sleeping
+        # away most of the interval after a successful read avoids thousands
+        # of futile dataReady transactions per sample
+        idle = 0.9 * CCS811.MEAS_INTERVAL_SECONDS[CCS811.MEAS_INT_1]
+        # run-length encode the output: stable readings show up as a counted
+        # repeat instead of a stream of identical lines
+        lastReadings = None
+        repeats = 0
+        lastFlush = _monotonic()
         try:
-            # use the I2C bus with default parameters only
-            i2cBus = I2Cbus()
-            print( 'Using I2C bus: {0}'.format( i2cBus ) )
-
-            print( 'Measurements obtained in poll mode:' )
-            aqSensor = CCS811( i2cBus )
             while True:
-                if aqSensor.dataReady:
-                    print( 'CO2: {0} ppm, total VOC: {1} '
-                           'ppb'.format( aqSensor.CO2, aqSensor.tVOC ) )
-                if aqSensor.errorCondition:
+                if _ready( aqSensor ):
+                    readings = _readings( aqSensor )
+                    if readings == lastReadings:
+                        repeats += 1
+                    else:
+                        if repeats:
+                            buffer.append( f'  (x{repeats + 1})' )
+                            repeats = 0
+                        lastReadings = readings
+                        co2, tVOC = readings
+                        buffer.append( f'CO2: {co2} ppm, '
+                                       f'total VOC: {tVOC} ppb' )
+                    # write a full batch right away but never sit on collected
+                    # lines longer than FLUSH_SECONDS - at the slow measurement
+                    # intervals a full batch can take minutes to accumulate
+                    if buffer and ( len( buffer ) >= BATCH_SIZE or
+                                    _monotonic() - lastFlush >=
+                                    FLUSH_SECONDS ):
+                        _write( '\n'.join( buffer ) + '\n' )
+                        buffer.clear()
+                        lastFlush = _monotonic()
+                    time.sleep( idle )
+                if _err( aqSensor ):
+                    # errors are rare and must show up right away
                     print( "Error: " + aqSensor.errorText )
-        except KeyboardInterrupt:
-            pass
-        except Exception as e:
-            if traceback is not None:
-                traceback.print_exc()
-            else:
-                print( e )
+        finally:
+            # don't discard collected lines when the loop ends (usually via
+            # KeyboardInterrupt) - close the repeat count and write them out
+            if repeats:
+                buffer.append( f'  (x{repeats + 1})' )
+            if buffer:
+                _write( '\n'.join( buffer ) + '\n' )
+        return
+
 
-        print( 'Exiting...' )
+    def makeBus():
+        """!
+        @brief Create the I2C bus - hardware mode at the CCS811's fast-mode
+               maximum of 400 kHz with fallback to the library default.
+
+        The Raspberry Pi's hardware I2C controller mishandles the clock
+        stretching the CCS811 requires, and that failure only shows up
+        during transactions, not when the bus is constructed.  Hence the
+        hardware bus is probed by reading the sensor's hardware ID register
+        before it is accepted.
+        """
+        # prefer hardware-mode I2C at 400 kHz - each bus transaction then
+        # completes several times faster than in bit-banged software mode
+        i2cBus = None
         try:
-            aqSensor.close()
-        except:
+            i2cBus = I2Cbus( mode=I2Cbus.HARDWARE_MODE,
+                             frequency=400000 )
+            if i2cBus.readByteReg( CCS811.DEFAULT_ADDR,
+                                   HW_ID_REG ) == HW_ID:
+                return i2cBus
+        except ( GPIOError, OSError ):
+            # a failing transaction on the Raspberry Pi's broken
+            # clock-stretching surfaces as OSError, just like the timeouts
+            # the driver itself retries on
             pass
-        i2cBus.close()
+        # fall back to the library default (software mode on the
+        # Raspberry Pi) when the sensor does not answer on the hardware bus
+        if i2cBus is not None:
+            i2cBus.close()
+        return I2Cbus()
+
 
-        return 0
+    def setup( i2cBus ):
+        """!
+        @brief Create the CCS811 sensor in poll mode.
+        @param i2cBus open I2Cbus object
+        """
+        print( 'Measurements obtained in poll mode:' )
+        return CCS811( i2cBus )
 
-    sys.exit( int( main() or 0 ) )
+    sys.exit( run( setup, measureLoop, busFactory=makeBus ) )
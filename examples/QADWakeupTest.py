@@ -41,116 +41,120 @@
 
 import sys
 
-try:
-    import os.path
-    import os
-    sys.path.append( os.path.join( os.path.dirname( __file__ ),
-                                   os.pardir ) )
-    sys.path.append( os.path.join( os.path.dirname( __file__ ),
-                                   os.pardir,
-                                   os.pardir,
-                                   'GPIO_AL' ) )
-except ImportError:
-    # on the Pico there is no os.path but all modules are in the same directory
-    pass
+import _pathsetup
 
 
 from GPIO_AL import *
 from CCS811 import *
 
+from _common import run
+
 try:
-    import traceback
-except:
-    traceback = None
+    _monotonic = time.monotonic
+except AttributeError:
+    # MicroPython provides no monotonic clock in its time module
+    _monotonic = time.time
 
 #  main program - Quick And Dirty Wakeup Test
 
 if __name__ == "__main__":
 
 
-    def main():
+    def waitAndReport( aqSensor, duration, idle, pollMode ):
         """!
-        @brief Quick And Dirty Wakeup Test for CCS811.
+        @brief Report fresh measurements for a given period of time.
+
+        Instead of hammering the sensor as fast as Python can iterate, the
+        loop sleeps between checks - the CCS811 produces at most one sample
+        per measurement interval anyway.
+        @param aqSensor CCS811 object under test
+        @param duration time to keep reporting in seconds
+        @param idle maximal time to sleep between checks in seconds
+        @param pollMode True to poll dataReady, False to watch the
+               measurements the ISR stores
         """
-
-        i2cBus = I2Cbus()
-        aqSensor = None
-
-        # CCS811 parameter(s):
-        interruptPin = 6
-        wakeupPin = 5
-        print( 'Connect GPIO Pin 5 to nWAK and GPIO Pin 6 to nINT' )
-        input( 'Hit Enter when done' )
-
-        try:
-            aqSensor = CCS811( i2cBus,
-                               interruptPin=interruptPin,
-                               wakeupPin=wakeupPin )
-            while True:
-                if not aqSensor.staleMeasurements:
-                    print( 'CO2: {0} ppm, total VOC: '
-                            '{1} ppb'.format( aqSensor.CO2, aqSensor.tVOC ) )
-                if aqSensor.errorCondition:
-                    print( aqSensor.errorText )
-
-                if interruptPin is None:
-                    print( 'poll mode...' )
-                    while True:
-                        startTime = time.time()
-                        while time.time() - startTime < 10:
-                            if aqSensor.dataReady:
-                                print( 'CO2: {0} ppm, total VOC: {1} '
-                                       'ppb'.format( aqSensor.CO2,
-                                                     aqSensor.tVOC ) )
-                        print( 'sending sensor to sleep '
-                               '(expect no measurements)...' )
-                        aqSensor.sleep()
-                        startTime = time.time()
-                        while time.time() - startTime < 10:
-                            if aqSensor.dataReady:
-                                print( 'CO2: {0} ppm, total VOC: {1} '
-                                       'ppb'.format( aqSensor.CO2,
-                                                     aqSensor.tVOC ) )
-                        print( 'waking sensor up again '
-                               '(expect new measurements)!' )
-                        aqSensor.wake()
-                else:
-                    print( 'interrupt mode...' )
-                    while True:
-                        startTime = time.time()
-                        while time.time() - startTime < 20:
-                            if not aqSensor.staleMeasurements:
-                                print( 'CO2: {0} ppm, total VOC: {1} '
-                                       'ppb'.format( aqSensor.CO2,
-                                                     aqSensor.tVOC ) )
-                        print( 'sending sensor to sleep '
-                               '(expect no measurements '
-                               'and no interrupt signals)...' )
-                        aqSensor.sleep()
-                        startTime = time.time()
-                        while time.time() - startTime < 20:
-                            if not aqSensor.staleMeasurements:
-                                print( 'CO2: {0} ppm, total VOC: {1} '
-                                       'ppb'.format( aqSensor.CO2,
-                                                     aqSensor.tVOC ) )
-                        print( 'waking sensor up again '
-                               '(expect new measurements)!' )
-                        aqSensor.wake()
-        except KeyboardInterrupt:
-            pass
-        except Exception as e:
-            if traceback is not None:
-                traceback.print_exc()
+        # back off exponentially while nothing arrives: stay responsive
+        # right after a sample, but cap steady-state wakeups during silence
+        # (most of these windows deliberately produce none)
+        minIdle = 0.01
+        curIdle = minIdle
+        # property getters hoisted out of the loop - see _common.py
+        _ready = type( aqSensor ).dataReady.fget
+        _stale = type( aqSensor ).staleMeasurements.fget
+        _readings = type( aqSensor ).readings.fget
+        # in interrupt mode with threading support, park on the worker
+        # thread's event instead of sleeping blindly
+        event = aqSensor.dataReadyEvent
+        deadline = _monotonic() + duration
+        while _monotonic() < deadline:
+            if pollMode:
+                fresh = _ready( aqSensor )
             else:
-                print( e )
+                if event is not None and _stale( aqSensor ):
+                    # block until fresh data arrives or the window closes
+                    event.clear()
+                    event.wait( max( 0., deadline - _monotonic() ) )
+                fresh = not _stale( aqSensor )
+            if fresh:
+                co2, tVOC = _readings( aqSensor )
+                print( f'CO2: {co2} ppm, total VOC: {tVOC} ppb' )
+                curIdle = minIdle
+            elif pollMode or event is None:
+                time.sleep( curIdle )
+                curIdle = min( curIdle * 1.5, idle )
+        return
+
+
+    # CCS811 parameter(s):
+    INTERRUPT_PIN = 6
+    WAKEUP_PIN = 5
+
+
+    def setup( i2cBus ):
+        """!
+        @brief Create the CCS811 sensor with interrupt and wakeup Pins.
+        @param i2cBus open I2Cbus object
+        """
+        print( 'Connect GPIO Pin {0} to nWAK and GPIO Pin {1} to '
+               'nINT'.format( WAKEUP_PIN, INTERRUPT_PIN ) )
+        input( 'Hit Enter when done' )
 
-        print( 'Exiting...' )
-        try:
-            aqSensor.close()
-        except:
-            pass
-        i2cBus.close()
+        aqSensor = CCS811( i2cBus,
+                           interruptPin=INTERRUPT_PIN,
+                           wakeupPin=WAKEUP_PIN )
+        if aqSensor.errorCondition:
+            print( aqSensor.errorText )
+        return aqSensor
 
-        return 0
 
-    sys.exit( int( main() or 0 ) )
+    def sleepWakeLoop( aqSensor ):
+        """!
+        @brief Cycle the sensor through sleep and wake phases forever.
+        @param aqSensor CCS811 object under test
+        """
+        pollMode = INTERRUPT_PIN is None
+        if pollMode:
+            print( 'poll mode...' )
+            duration = 10
+            sleepBanner = 'sending sensor to sleep ' \
+                          '(expect no measurements)...'
+        else:
+            print( 'interrupt mode...' )
+            duration = 20
+            sleepBanner = 'sending sensor to sleep ' \
+                          '(expect no measurements ' \
+                          'and no interrupt signals)...'
+        # cap the backoff sleep at half the measurement interval -
+        # waiting longer would risk skipping a sample
+        idle = CCS811.MEAS_INTERVAL_SECONDS[CCS811.MEAS_INT_1] / 2.
+        while True:
+            waitAndReport( aqSensor, duration, idle, pollMode )
+            print( sleepBanner )
+            aqSensor.sleep()
+            waitAndReport( aqSensor, duration, idle, pollMode )
+            print( 'waking sensor up again '
+                   '(expect new measurements)!' )
+            aqSensor.wake()
+        return
+
+    sys.exit( run( setup, sleepWakeLoop ) )
@@ -38,74 +38,73 @@
 
 import sys
 
-try:
-    import os.path
-    import os
-    sys.path.append( os.path.join( os.path.dirname( __file__ ),
-                                   os.pardir ) )
-    sys.path.append( os.path.join( os.path.dirname( __file__ ),
-                                   os.pardir,
-                                   os.pardir,
-                                   'GPIO_AL' ) )
-except ImportError:
-    # on the Pico there is no os.path but all modules are in the same directory
-    pass
+import _pathsetup
 
 
 from GPIO_AL import *
 from CCS811 import *
 
+from _common import run
+
 #  main program - Quick And Dirty Interrupt Test
 
 if __name__ == "__main__":
 
 
-    def main():
+    def setup( i2cBus ):
         """!
-        @brief Quick And Dirty Interrupt Test for CCS811.
+        @brief Create the CCS811 sensor in interrupt mode.
+        @param i2cBus open I2Cbus object
         """
+        global measInterval
 
-        i2cBus = None
-        aqSensor = None
-
-        try:
-            # use the I2C bus with default parameters only
-            i2cBus = I2Cbus()
-            print( 'Using I2C bus: {0}'.format( i2cBus ) )
+        # CCS811 interrupt Pin hard coded as 6
+        interruptPin = 6
 
-            # CCS811 interrupt Pin hard coded as 6
-            interruptPin = 6
+        input( f'Connect CCS811 interrupt Pin to Pin {interruptPin} of '
+               'the Raspberry Pi and hit Enter when done' )
 
-            input( 'Connect CCS811 interrupt Pin to Pin {0} of the Raspberry '
-                   'Pi and hit Enter when done'.format( interruptPin ) )
+        # construct the sensor before prompting for the interval so its
+        # boot sequence and the first burn-in seconds overlap with the
+        # user's think time
+        aqSensor = CCS811( i2cBus,
+                           interruptPin=interruptPin )
 
-            interval = int( input( 'Enter measurement interval (1, 2, or 3'
+        measInterval = int( input( 'Enter measurement interval (1, 2, or 3'
                                    ' for 1 s, 10 s, or 60 s): ' ) )
+        aqSensor.setMeasInterval( measInterval )
+
+        print( 'Measurements obtained under interrupt control:' )
+        return aqSensor
 
-            print( 'Measurements obtained under interrupt control:' )
-
-            aqSensor = CCS811( i2cBus,
-                               measInterval=interval,
-                               interruptPin=interruptPin )
-
-            while True:
-                if not aqSensor.staleMeasurements:
-                    if aqSensor.errorCondition:
-                        continue
-                    print( 'CO2: {0} ppm, total VOC: '
-                           '{1} ppb'.format( aqSensor.CO2, aqSensor.tVOC ) )
-        except KeyboardInterrupt:
-            pass
-        except Exception as e:
-            print( e )
-
-        print( 'Exiting...' )
-        try:
-            aqSensor.close()
-        except:
-            pass
-        i2cBus.close()
-
-        return 0
-
-    sys.exit( int( main() or 0 ) )
+
+    def measureLoop( aqSensor ):
+        """!
+        @brief Print fresh measurements forever, quietly ignoring errors.
+        @param aqSensor CCS811 object operated in interrupt mode
+        """
+        # block on the worker thread's data-ready event instead of
+        # spinning on staleMeasurements - zero CPU while waiting; the
+        # timeout keeps Ctrl-C responsive
+        event = aqSensor.dataReadyEvent
+        idle = CCS811.MEAS_INTERVAL_SECONDS[measInterval] / 20.
+        # property getters hoisted out of the loop - see _common.py
+        _stale = type( aqSensor ).staleMeasurements.fget
+        _err = type( aqSensor ).errorCondition.fget
+        _readings = type( aqSensor ).readings.fget
+        while True:
+            if event is not None:
+                event.wait( 2 )
+                event.clear()
+            if not _stale( aqSensor ):
+                if _err( aqSensor ):
+                    # errors are exactly what this example ignores
+                    continue
+                co2, tVOC = _readings( aqSensor )
+                print( f'CO2: {co2} ppm, total VOC: {tVOC} ppb' )
+            elif event is None:
+                # no threading support - pace the polling instead
+                time.sleep( idle )
+        return
+
+    sys.exit( run( setup, measureLoop ) )
@@ -0,0 +1,97 @@
+# Python Implementation: _common
+##
+# @file       _common.py
+#
+# @version    1.0.0
+#
+# @par Purpose
+# This module provides the scaffolding every CCS811 example program needs:
+# opening the I2C bus, funneling KeyboardInterrupt and errors to one place,
+# and guaranteeing that sensor and bus get closed on the way out.  Keeping it
+# in one module means the interpreter parses and compiles the boilerplate
+# once, which matters on the Pico where no .pyc cache exists.
+#
+# The example measurement loops share two idioms whose rationale lives here
+# instead of being repeated in every file: property getters are hoisted out
+# of hot loops (e.g. _ready = type( aqSensor ).dataReady.fget), as a
+# pre-bound fget call skips the class-dict and descriptor lookup every
+# attribute access would otherwise repeat, and both measurement values are
+# always obtained through the single readings property, which guarantees
+# they stem from the same sample without extra I2C traffic (see its
+# docstring).
+#
+# @par Comments
+# This is Python 3 code!  PEP 8 guidelines are decidedly NOT followed in some
+# instances, and guidelines provided by "Coding Style Guidelines" a "Process
+# Guidelines" document from WEB Design are used instead where the two differ,
+# as the latter span several programming languages and are therefore applicable
+# also for projects that require more than one programming language; it also
+# provides consistency across hundreds of thousands of lines of legacy code.
+# Doing so, ironically, is following PEP 8.
+#
+# @par Known Bugs
+# None
+#
+# @author
+# W. Ekkehard Blanz <Ekkehard.Blanz@gmail.com>
+#
+# @copyright
+# Copyright 2026 W. Ekkehard Blanz
+# See NOTICE.md and LICENSE.md files that come with this distribution.
+
+# File history:
+#
+#      Date         | Author         | Modification
+#  -----------------+----------------+------------------------------------------
+#   Fri Aug 28 2026 | Ekkehard Blanz | created
+#                   |                |
+
+import _pathsetup
+
+from GPIO_AL import I2Cbus
+
+from _platform import printExc
+
+
+def run( setup, body, busFactory=None ):
+    """!
+    @brief Run an example program with shared setup, error handling, and
+           guaranteed cleanup.
+
+    The function opens the I2C bus, hands it to setup() to construct the
+    sensor, and then calls body() with that sensor - typically an infinite
+    measurement loop ended via KeyboardInterrupt.  Sensor and bus are closed
+    in that order no matter how body() ends.
+    @param setup callable receiving the open I2Cbus object and returning the
+           fully constructed CCS811 object
+    @param body callable receiving the CCS811 object
+    @param busFactory optional callable creating the I2Cbus object - defaults
+           to I2Cbus() with default parameters
+    @return 0 - suitable as argument to sys.exit()
+    """
+    i2cBus = None
+    aqSensor = None
+
+    try:
+        if busFactory is None:
+            i2cBus = I2Cbus()
+        else:
+            i2cBus = busFactory()
+        print( f'Using I2C bus: {i2cBus}' )
+
+        aqSensor = setup( i2cBus )
+        body( aqSensor )
+    except KeyboardInterrupt:
+        pass
+    except Exception:
+        printExc()
+    finally:
+        # the finally clause also runs on SystemExit and guarantees the bus
+        # is closed even if the sensor setup failed
+        print( 'Exiting...' )
+        if aqSensor is not None:
+            aqSensor.close()
+        if i2cBus is not None:
+            i2cBus.close()
+
+    return 0
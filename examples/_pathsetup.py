@@ -0,0 +1,50 @@
+# Python Implementation: _pathsetup
+##
+# @file       _pathsetup.py
+#
+# @version    1.0.0
+#
+# @par Purpose
+# This module extends sys.path so that the example programs find the CCS811
+# module one directory up and the GPIO_AL module in a sibling project.  The
+# relative locations are fixed at source-write time, so plain string
+# concatenation suffices and the os.path machinery stays out of the import
+# chain; importing this module from several examples in a row does the work
+# only once thanks to the import cache.
+#
+# @par Comments
+# This is Python 3 code!  PEP 8 guidelines are decidedly NOT followed in some
+# instances, and guidelines provided by "Coding Style Guidelines" a "Process
+# Guidelines" document from WEB Design are used instead where the two differ,
+# as the latter span several programming languages and are therefore applicable
+# also for projects that require more than one programming language; it also
+# provides consistency across hundreds of thousands of lines of legacy code.
+# Doing so, ironically, is following PEP 8.
+#
+# @par Known Bugs
+# None
+#
+# @author
+# W. Ekkehard Blanz <Ekkehard.Blanz@gmail.com>
+#
+# @copyright
+# Copyright 2026 W. Ekkehard Blanz
+# See NOTICE.md and LICENSE.md files that come with this distribution.
+
+# File history:
+#
+#      Date         | Author         | Modification
+#  -----------------+----------------+------------------------------------------
+#   Fri Aug 28 2026 | Ekkehard Blanz | created
+#                   |                |
+
+import sys
+
+if '/' in __file__:
+    _here = __file__.rsplit( '/', 1 )[0]
+    sys.path.append( _here + '/..' )
+    sys.path.append( _here + '/../../GPIO_AL' )
+else:
+    # on the Pico all modules reside in the same directory and sys.path
+    # needs no help
+    pass
@@ -0,0 +1,74 @@
+# Python Implementation: _platform
+##
+# @file       _platform.py
+#
+# @version    1.0.0
+#
+# @par Purpose
+# This module resolves the platform differences between the Raspberry Pi
+# (CPython) and the Raspberry Pi Pico (MicroPython) that the example programs
+# care about - once, at first import, instead of in every example file.  The
+# import cache makes every subsequent import a dict lookup.
+#
+# @par Comments
+# This is Python 3 code!  PEP 8 guidelines are decidedly NOT followed in some
+# instances, and guidelines provided by "Coding Style Guidelines" a "Process
+# Guidelines" document from WEB Design are used instead where the two differ,
+# as the latter span several programming languages and are therefore applicable
+# also for projects that require more than one programming language; it also
+# provides consistency across hundreds of thousands of lines of legacy code.
+# Doing so, ironically, is following PEP 8.
+#
+# @par Known Bugs
+# None
+#
+# @author
+# W. Ekkehard Blanz <Ekkehard.Blanz@gmail.com>
+#
+# @copyright
+# Copyright 2026 W. Ekkehard Blanz
+# See NOTICE.md and LICENSE.md files that come with this distribution.
+
+# File history:
+#
+#      Date         | Author         | Modification
+#  -----------------+----------------+------------------------------------------
+#   Fri Aug 28 2026 | Ekkehard Blanz | created
+#                   |                |
+
+import sys
+
+if sys.implementation.name == 'micropython':
+    # keyboard interrupt on Raspberry Pi Pico is broken and gets "stuck"
+    # so new inputs are also interrupted - use 'q' instead where possible
+    ##! string describing how to end a test program
+    exitChar = 'q'
+else:
+    ##! string describing how to end a test program
+    exitChar = 'Ctrl-C'
+
+
+def printExc():
+    """!
+    @brief Print the active exception - with a traceback where available.
+
+    The traceback module (and the linecache/tokenize machinery it drags in)
+    is only imported here, on the error path, so programs that never fail
+    never pay for it at startup.
+    """
+    try:
+        import traceback
+        traceback.print_exc()
+    except ImportError:
+        # MicroPython has no traceback module
+        print( sys.exc_info()[1] )
+    return
+
+if sys.implementation.name == 'micropython':
+    import micropython
+    ##! decorator compiling a function with MicroPython's native code emitter
+    native = micropython.native
+else:
+    # CPython has no native code emitter - use the identity decorator
+    def native( f ):
+        return f